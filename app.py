@@ -1,11 +1,47 @@
-import os
 import re
 import json
-import networkx as nx
+from functools import lru_cache
 from flask import Flask, render_template, request, jsonify
 
 app = Flask(__name__)
 
+# Binding strength of the supported binary operators (all left-associative)
+OPERATOR_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+
+# Operators whose operands may be swapped (a+b = b+a, a*b = b*a)
+COMMUTATIVE_OPERATORS = ('+', '*')
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Full-width ASCII forms (U+FF01-U+FF5E) and the Unicode asterisk operator fold onto
+# the plain characters the tokenizer expects; identifiers are otherwise left alone
+COMPATIBILITY_CHARACTERS = {code: code - 0xFEE0 for code in range(0xFF01, 0xFF5F)}
+COMPATIBILITY_CHARACTERS[ord('∗')] = '*'
+
+# Longest normalized expression /process will analyze
+MAX_EXPRESSION_LENGTH = 1000
+
+# Longest expression whose encoded response is memoized; at this length a response
+# is at most about 18 KB, so a full cache stays under ~20 MB per worker
+MAX_CACHED_EXPRESSION_LENGTH = 100
+
+# Token kinds recognized by the tokenizer, tried in order
+TOKEN_PATTERN = re.compile(
+    r'(?P<IDENT>\w+)|(?P<OP>[-+*/])|(?P<LPAREN>\()|(?P<RPAREN>\))|(?P<INVALID>.)'
+)
+
+def normalize_expression(expression):
+    """Return the expression in the canonical form the parser works on."""
+    # Remove all whitespace
+    expression = WHITESPACE_PATTERN.sub('', expression)
+    # Fold full-width characters and the Unicode asterisk to ASCII
+    return expression.translate(COMPATIBILITY_CHARACTERS)
+
+def combine_labels(left_label, right_label):
+    """Return the Sethi-Ullman label of a binary node from its operands' labels."""
+    # max(l, r) when they differ, l + 1 when they are equal
+    return max(left_label, right_label) + (left_label == right_label)
+
 class DAGNode:
     """Represents a node in the DAG for register allocation."""
     def __init__(self, id, value, node_type="operation"):
@@ -32,31 +68,64 @@ class DAGNode:
 class RegisterAllocator:
     """Handles register allocation using the DAG-based labeling algorithm."""
     def __init__(self):
-        self.nodes = {}
+        self.nodes = []  # Indexed by node id: a node's id is its position in this list
         self.root = None
-        self.next_id = 0
-        self.three_address_code = []
+        self.three_address_code = None  # (target, left, op, right) tuples, built on first use
         self.temp_counter = 1
+        self.node_cache = {}  # (value, type, child ids) -> node id, shares common subexpressions
+        self.has_commutative_op = False  # Rearrangement only ever applies to + and *
+        self.post_order = None  # Nodes reachable from the root, children first; cleared when the DAG changes
     
     def reset(self):
         """Reset the allocator state."""
-        self.nodes = {}
+        self.nodes = []
         self.root = None
-        self.next_id = 0
-        self.three_address_code = []
+        self.three_address_code = None
         self.temp_counter = 1
+        self.node_cache = {}
+        self.has_commutative_op = False
+        self.post_order = None
     
-    def get_next_id(self):
-        """Generate a unique ID for a new node."""
-        new_id = self.next_id
-        self.next_id += 1
-        return new_id
+    def copy(self):
+        """Return an independent copy of the allocator, including its DAG and labels."""
+        clone = RegisterAllocator()
+        # Rebuild the nodes in id order, then rewire children by id (no recursion needed)
+        clone.nodes = [DAGNode(node.id, node.value, node.node_type) for node in self.nodes]
+        for node, copied in zip(self.nodes, clone.nodes):
+            copied.label = node.label
+            copied.children = [clone.nodes[child.id] for child in node.children]
+        
+        clone.root = clone.nodes[self.root.id] if self.root else None
+        if self.three_address_code is not None:
+            clone.three_address_code = list(self.three_address_code)
+        clone.temp_counter = self.temp_counter
+        clone.node_cache = dict(self.node_cache)
+        clone.has_commutative_op = self.has_commutative_op
+        if self.post_order is not None:
+            clone.post_order = [clone.nodes[node.id] for node in self.post_order]
+        return clone
     
     def create_node(self, value, node_type="operation"):
         """Create a new node and add it to the DAG."""
-        node_id = self.get_next_id()
-        node = DAGNode(node_id, value, node_type)
-        self.nodes[node_id] = node
+        node = DAGNode(len(self.nodes), value, node_type)
+        self.nodes.append(node)
+        self.post_order = None
+        return node
+    
+    def get_or_create_node(self, value, node_type="operation", children=()):
+        """Return the node applying value to children, creating it only the first time it is seen."""
+        # Keyed on the ordered child ids: labels depend on operand order, so b+a
+        # must not reuse a node built for a+b
+        key = (value, node_type) + tuple(child.id for child in children)
+        if key in self.node_cache:
+            return self.nodes[self.node_cache[key]]
+        
+        node = self.create_node(value, node_type)
+        if value in COMMUTATIVE_OPERATORS:
+            self.has_commutative_op = True
+        for child in children:
+            node.add_child(child)
+        self.node_cache[key] = node.id
         return node
     
     def get_next_temp(self):
@@ -68,255 +137,261 @@ class RegisterAllocator:
     def parse_expression(self, expression):
         """Parse an arithmetic expression and build the DAG."""
         self.reset()
-        # Remove all whitespace
-        expression = re.sub(r'\s+', '', expression)
-        # Replace Unicode multiplication symbol with standard asterisk
-        expression = expression.replace('∗', '*')
+        expression = normalize_expression(expression)
         self.root = self._parse_expression(expression)
-        
-        # Generate 3-address code during parsing
-        self._generate_three_address_code(self.root)
-        
         return self.root
     
+    def _tokenize(self, expr):
+        """Split an expression into (kind, value) tokens in one pass."""
+        return [(match.lastgroup, match.group()) for match in TOKEN_PATTERN.finditer(expr)]
+
     def _parse_expression(self, expr):
-        """Recursive helper to parse expressions."""
+        """Parse an expression into the DAG with a single shunting-yard pass over its tokens."""
         if not expr:
             raise ValueError("Empty expression")
-            
-        # Look for addition/subtraction at the top level
-        parenthesis_level = 0
-        for i in range(len(expr) - 1, -1, -1):  # Scan right to left for proper associativity
-            if expr[i] == ')':
-                parenthesis_level += 1
-            elif expr[i] == '(':
-                parenthesis_level -= 1
-                if parenthesis_level < 0:
+
+        operands = []  # Nodes built so far
+        operators = []  # Pending operators and open parentheses
+        expect_operand = True
+
+        for kind, token in self._tokenize(expr):
+            if kind == 'OP':
+                if expect_operand:
+                    raise ValueError(f"Invalid expression around operator '{token}': {expr}")
+                # Reduce everything that binds at least as tightly (left associativity)
+                while (operators and operators[-1] != '(' and
+                       OPERATOR_PRECEDENCE[operators[-1]] >= OPERATOR_PRECEDENCE[token]):
+                    self._build_operation(operators.pop(), operands)
+                operators.append(token)
+                expect_operand = True
+            elif kind == 'LPAREN':
+                if not expect_operand:
+                    raise ValueError(f"Could not parse expression: {expr}")
+                operators.append(token)
+            elif kind == 'RPAREN':
+                if expect_operand:
+                    if operators and operators[-1] != '(':
+                        raise ValueError(f"Invalid expression around operator '{operators[-1]}': {expr}")
+                    raise ValueError("Empty expression")
+                while operators and operators[-1] != '(':
+                    self._build_operation(operators.pop(), operands)
+                if not operators:
                     raise ValueError(f"Mismatched parentheses in expression: {expr}")
-            elif parenthesis_level == 0 and expr[i] in ['+', '-']:
-                # Split at this operator
-                left_expr = expr[:i]
-                right_expr = expr[i+1:]
-                
-                # Check for empty expressions
-                if not left_expr or not right_expr:
-                    raise ValueError(f"Invalid expression around operator '{expr[i]}': {expr}")
-                
-                op_node = self.create_node(expr[i])
-                left_node = self._parse_expression(left_expr)
-                right_node = self._parse_expression(right_expr)
-                
-                op_node.add_child(left_node)
-                op_node.add_child(right_node)
-                return op_node
+                operators.pop()
+            elif kind == 'IDENT':
+                # Variable or constant
+                if not expect_operand:
+                    raise ValueError(f"Could not parse expression: {expr}")
+                operands.append(self.get_or_create_node(token, "variable"))
+                expect_operand = False
+            else:
+                raise ValueError(f"Could not parse expression: {expr}")
+
+        if expect_operand:
+            if operators and operators[-1] != '(':
+                raise ValueError(f"Invalid expression around operator '{operators[-1]}': {expr}")
+            raise ValueError(f"Mismatched parentheses in expression: {expr}")
+
+        while operators:
+            operator = operators.pop()
+            if operator == '(':
+                raise ValueError(f"Mismatched parentheses in expression: {expr}")
+            self._build_operation(operator, operands)
+
+        return operands[0]
+
+    def _build_operation(self, operator, operands):
+        """Pop the two topmost operands and push the node that applies operator to them."""
+        right_node = operands.pop()
+        left_node = operands.pop()
+        operands.append(self.get_or_create_node(operator, children=(left_node, right_node)))
+    
+    def _generate_three_address_code(self, root):
+        """Generate three-address code for the expression."""
+        results = {}  # Node id -> variable or temporary holding its value
         
-        # No addition/subtraction found, look for multiplication/division
-        parenthesis_level = 0
-        for i in range(len(expr) - 1, -1, -1):  # Scan right to left
-            if expr[i] == ')':
-                parenthesis_level += 1
-            elif expr[i] == '(':
-                parenthesis_level -= 1
-                if parenthesis_level < 0:
-                    raise ValueError(f"Mismatched parentheses in expression: {expr}")
-            elif parenthesis_level == 0 and expr[i] in ['*', '/']:
-                # Split at this operator
-                left_expr = expr[:i]
-                right_expr = expr[i+1:]
+        # Children come first, so operands are always named before they are used;
+        # a shared subexpression is visited once and its temporary reused
+        for node in self._ordered_nodes():
+            if node.node_type == "variable":
+                results[node.id] = node.value
+            elif len(node.children) == 2:
+                left_result = results[node.children[0].id]
+                right_result = results[node.children[1].id]
                 
-                # Check for empty expressions
-                if not left_expr or not right_expr:
-                    raise ValueError(f"Invalid expression around operator '{expr[i]}': {expr}")
+                # Create a new temporary variable
+                temp = self.get_next_temp()
                 
-                op_node = self.create_node(expr[i])
-                left_node = self._parse_expression(left_expr)
-                right_node = self._parse_expression(right_expr)
+                # Add the three-address code instruction
+                self.three_address_code.append((temp, left_result, node.value, right_result))
                 
-                op_node.add_child(left_node)
-                op_node.add_child(right_node)
-                return op_node
-        
-        # Check for parentheses
-        if expr.startswith('(') and expr.endswith(')'):
-            # Count opening and closing parentheses
-            open_count = expr.count('(')
-            close_count = expr.count(')')
-            
-            if open_count != close_count:
-                raise ValueError(f"Mismatched parentheses in expression: {expr}")
-            
-            # Verify this is a properly parenthesized expression
-            paren_level = 0
-            for i, char in enumerate(expr):
-                if char == '(':
-                    paren_level += 1
-                elif char == ')':
-                    paren_level -= 1
-                    if paren_level == 0 and i < len(expr) - 1:
-                        # If we reach a closing paren that matches the opening one
-                        # but we're not at the end, then the entire expr is not wrapped
-                        break
-            
-            # If the expression is fully wrapped in parentheses, strip them and parse the inner expression
-            if paren_level == 0 and i == len(expr) - 1:
-                return self._parse_expression(expr[1:-1])
-        
-        # If it's a single character or we couldn't split further, it's a variable or constant
-        if len(expr) == 1 or all(c.isalnum() or c == '_' for c in expr):
-            var_node = self.create_node(expr, "variable")
-            return var_node
-        
-        raise ValueError(f"Could not parse expression: {expr}")
-    
-    def _generate_three_address_code(self, node):
-        """Generate three-address code for the expression."""
-        if node.node_type == "variable":
-            return node.value
-            
-        if len(node.children) == 2:
-            left_result = self._generate_three_address_code(node.children[0])
-            right_result = self._generate_three_address_code(node.children[1])
-            
-            # Create a new temporary variable
-            temp = self.get_next_temp()
-            
-            # Add the three-address code instruction
-            self.three_address_code.append(f"{temp} = {left_result} {node.value} {right_result}")
-            
-            return temp
-            
-        return None
+                results[node.id] = temp
+                
+        return results.get(root.id)
     
     def get_three_address_code(self):
-        """Return the generated three-address code."""
-        return self.three_address_code
+        """Return the three-address code as strings, generating it if the DAG changed since the last call."""
+        if self.three_address_code is None:
+            self.three_address_code = []
+            if self.root:
+                self._generate_three_address_code(self.root)
+        return [f"{temp} = {left} {op} {right}" for temp, left, op, right in self.three_address_code]
         
     def assign_labels(self):
         """Assign register requirement labels to all nodes in the DAG using the Sethi-Ullman algorithm."""
         if self.root:
-            self._assign_label(self.root)
+            # Children always precede their parents, so every label is built from finished ones
+            for node in self._ordered_nodes():
+                self._assign_label(node)
             return self.root.label
         return None
-    
-    def _assign_label(self, node, is_leftmost=True):
-        """Recursive helper to assign labels according to the Sethi-Ullman algorithm."""
-        # Leaf node (variable)
+
+    def _ordered_nodes(self):
+        """Return the post-order of the whole DAG, walking it only when the structure has changed."""
+        if self.post_order is None:
+            self.post_order = self._post_order(self.root)
+        return self.post_order
+
+    def _post_order(self, root):
+        """Return the nodes below root once each, with every child listed before its parents."""
+        order = []
+        visited = set()
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                order.append(node)
+                continue
+            # Shared subexpressions are reachable through several parents
+            if node.id in visited:
+                continue
+            visited.add(node.id)
+            stack.append((node, True))
+            # Push right to left so the left child is finished first
+            for child in reversed(node.children):
+                if child.id not in visited:
+                    stack.append((child, False))
+        return order
+
+    def _assign_label(self, node):
+        """Assign the Sethi-Ullman label of a node whose children are already labeled."""
+        # Leaf node (variable): shown as needing a register only where it is a leftmost operand
         if node.node_type == "variable":
-            if is_leftmost:
-                node.label = 1
-            else:
-                node.label = 0
+            node.label = 1 if node is self.root else 0
             return node.label
-        
-        # If node has children, process them first
+
         if len(node.children) == 2:
             left_child = node.children[0]
             right_child = node.children[1]
-            
-            # Left child is always leftmost to its parent
-            left_label = self._assign_label(left_child, True)
-            
-            # Right child is not leftmost
-            right_label = self._assign_label(right_child, False)
-            
-            # Apply the Sethi-Ullman labeling rules
-            if left_label == right_label:
-                node.label = left_label + 1
-            else:
-                node.label = max(left_label, right_label)
-                
+
+            # Left child is always leftmost to its parent, the right child never is
+            if left_child.node_type == "variable":
+                left_child.label = 1
+            left_label = self._operand_label(left_child, True)
+            right_label = self._operand_label(right_child, False)
+
+            node.label = combine_labels(left_label, right_label)
             return node.label
         elif len(node.children) == 1:
             # Unary operation - treat the child as leftmost
-            child_label = self._assign_label(node.children[0], True)
-            node.label = child_label
+            child = node.children[0]
+            if child.node_type == "variable":
+                child.label = 1
+            node.label = self._operand_label(child, True)
             return node.label
-        
+
         # Default case
         node.label = 1
         return 1
+
+    def _operand_label(self, node, is_leftmost):
+        """Return the registers needed for node when used as an operand on the given side."""
+        # A shared leaf can be leftmost for one parent and not for another,
+        # so leaf requirements come from the position rather than node.label
+        if node.node_type == "variable":
+            return int(is_leftmost)
+        return node.label
     
     def rearrange_dag(self):
         """Rearrange the DAG using algebraic properties to minimize register usage."""
-        if self.root:
-            self.root = self._rearrange_node(self.root)
-            # Re-assign labels after rearrangement
-            self.assign_labels()
-            # Regenerate 3-address code
-            self.three_address_code = []
-            self._generate_three_address_code(self.root)
+        # Without + or * neither commutativity nor associativity can apply
+        if self.root and self.has_commutative_op:
+            # Children are rearranged and relabeled before their parents, so every
+            # decision sees final operand labels and no second labeling pass is needed
+            for node in self._ordered_nodes():
+                self._rearrange_node(node)
+                self._assign_label(node)
+            # Swaps and rotations change the order; it and the code are rebuilt on demand
+            self.post_order = None
+            self.three_address_code = None
             return True
         return False
     
     def _rearrange_node(self, node):
-        """Recursively rearrange the subtree rooted at node to minimize register usage."""
-        # Base case: leaf node
-        if node.node_type == "variable":
-            return node
-        
-        # Rearrange children first
-        for i in range(len(node.children)):
-            node.children[i] = self._rearrange_node(node.children[i])
-        
+        """Rearrange a single node whose children are already rearranged and labeled."""
         # For binary operations
-        if len(node.children) == 2:
+        if node.node_type != "variable" and len(node.children) == 2:
             left_child = node.children[0]
             right_child = node.children[1]
             
             # Apply commutativity (a+b = b+a, a*b = b*a)
-            if node.value in ['+', '*']:
+            if node.value in COMMUTATIVE_OPERATORS:
                 # If right subtree is more complex, swap children
-                if right_child.label > left_child.label:
+                if self._operand_label(right_child, False) > self._operand_label(left_child, True):
                     node.children[0] = right_child
                     node.children[1] = left_child
                     
             # Apply associativity ((a+b)+c = a+(b+c), (a*b)*c = a*(b*c))
-            if node.value in ['+', '*'] and left_child.value == node.value:
+            if node.value in COMMUTATIVE_OPERATORS and left_child.value == node.value:
                 left_left = left_child.children[0]
                 left_right = left_child.children[1]
                 
                 # Check if rearranging (a op b) op c to a op (b op c) reduces register needs
-                current_max = max(left_child.label, right_child.label)
+                current_max = max(left_child.label, self._operand_label(right_child, False))
                 
-                # Create a temporary node representing (b op c)
-                temp_node = self.create_node(node.value)
-                temp_node.add_child(left_right)
-                temp_node.add_child(right_child)
-                self._assign_label(temp_node)
+                # Label that (b op c) would get, worked out without building the node
+                temp_label = combine_labels(
+                    self._operand_label(left_right, True),
+                    self._operand_label(right_child, False)
+                )
                 
                 # Check if a op (b op c) would use fewer registers
-                new_max = max(left_left.label, temp_node.label)
+                new_max = max(self._operand_label(left_left, True), temp_label)
                 
                 if new_max < current_max:
-                    # Rearrange to a op (b op c)
+                    # Rearrange to a op (b op c), only now creating the (b op c) node
+                    temp_node = self.create_node(node.value)
+                    temp_node.add_child(left_right)
+                    temp_node.add_child(right_child)
+                    self._assign_label(temp_node)
                     node.children[0] = left_left
                     node.children[1] = temp_node
-        
-        return node
     
     def get_dag_as_dict(self):
         """Convert the DAG to a dictionary for visualization."""
-        if not self.nodes:
+        if not self.root:
             return {}
         
-        nodes_data = []
-        edges_data = []
-        
-        for node_id, node in self.nodes.items():
-            node_data = {
-                "id": node_id,
+        # Only nodes still reachable from the root; rearrangement can detach old ones
+        nodes = self._ordered_nodes()
+        # node_type is already "variable" or "operation", the group names used by the page
+        nodes_data = [
+            {
+                "id": node.id,
                 "label": f"{node.value}\nLabel: {node.label}",
-                "group": "variable" if node.node_type == "variable" else "operation"
+                "group": node.node_type
             }
-            nodes_data.append(node_data)
-            
-            for child in node.children:
-                edge_data = {
-                    "from": node_id,
-                    "to": child.id,
-                    "arrows": "to"
-                }
-                edges_data.append(edge_data)
+            for node in nodes
+        ]
+        edges_data = [
+            {
+                "from": node.id,
+                "to": child.id,
+                "arrows": "to"
+            }
+            for node in nodes
+            for child in node.children
+        ]
         
         return {
             "nodes": nodes_data,
@@ -329,49 +404,100 @@ class RegisterAllocator:
             return []
             
         steps = []
-        self._generate_allocation_steps(self.root, steps)
-        return steps
-    
-    def _generate_allocation_steps(self, node, steps, register_map=None):
-        """Generate register allocation steps for evaluation."""
-        if register_map is None:
-            register_map = {}
+        results = []  # Registers holding evaluated operands, most recent last
+        used_registers = 1  # Bit n is set while Rn holds a value; bit 0 stands in for the unused R0
+        
+        # Explicit post-order walk; a shared node is evaluated again for each of its uses
+        stack = [(self.root, False, False)]
+        while stack:
+            node, expanded, right_first = stack.pop()
             
-        # Leaf node (variable)
-        if node.node_type == "variable":
-            reg = f"R{len(register_map) + 1}"
-            register_map[node.id] = reg
-            steps.append(f"Load {node.value} into {reg}")
-            return reg
+            # Leaf node (variable): load it into the lowest free register
+            if node.node_type == "variable":
+                # The lowest clear bit is the lowest free register, released or brand new
+                reg = (~used_registers & (used_registers + 1)).bit_length() - 1
+                used_registers |= 1 << reg
+                steps.append(f"Load {node.value} into R{reg}")
+                results.append(reg)
+                continue
             
-        # Process binary operation
-        if len(node.children) == 2:
             left_child = node.children[0]
             right_child = node.children[1]
             
-            # Decide evaluation order based on labels
-            if left_child.label < right_child.label:
-                # Evaluate right subtree first (it needs more registers)
-                right_reg = self._generate_allocation_steps(right_child, steps, register_map)
-                left_reg = self._generate_allocation_steps(left_child, steps, register_map)
-            else:
-                # Evaluate left subtree first
-                left_reg = self._generate_allocation_steps(left_child, steps, register_map)
-                right_reg = self._generate_allocation_steps(right_child, steps, register_map)
+            if not expanded:
+                # Evaluate the subtree that needs more registers first
+                right_first = self._operand_label(left_child, True) < self._operand_label(right_child, False)
+                stack.append((node, True, right_first))
+                if right_first:
+                    stack.append((left_child, False, False))
+                    stack.append((right_child, False, False))
+                else:
+                    stack.append((right_child, False, False))
+                    stack.append((left_child, False, False))
+                continue
             
-            # Perform operation
-            steps.append(f"{left_reg} {node.value} {right_reg} → {left_reg}")
+            # Both operands are ready, the one evaluated last is on top
+            if right_first:
+                left_reg = results.pop()
+                right_reg = results.pop()
+            else:
+                right_reg = results.pop()
+                left_reg = results.pop()
             
-            # Free the right register if it's no longer needed
-            if right_reg in register_map.values():
-                for k, v in list(register_map.items()):
-                    if v == right_reg:
-                        del register_map[k]
-                        
-            register_map[node.id] = left_reg
-            return left_reg
+            # Perform operation, then the right register is no longer needed
+            steps.append(f"R{left_reg} {node.value} R{right_reg} → R{left_reg}")
+            used_registers &= ~(1 << right_reg)
+            results.append(left_reg)
             
-        return None
+        return steps
+
+def analyze_expression(expression):
+    """Analyze a normalized expression before and after rearrangement."""
+    # Parse and analyze original expression
+    allocator = RegisterAllocator()
+    allocator.parse_expression(expression)
+    allocator.assign_labels()
+    
+    original_dag = allocator.get_dag_as_dict()
+    original_min_registers = allocator.root.label if allocator.root else 0
+    original_steps = allocator.get_allocation_steps()
+    original_3ac = allocator.get_three_address_code()
+    
+    if allocator.has_commutative_op:
+        # Rearrange a copy of the already parsed and labeled DAG
+        rearrange_allocator = allocator.copy()
+        rearrange_allocator.rearrange_dag()
+        
+        rearranged_dag = rearrange_allocator.get_dag_as_dict()
+        rearranged_min_registers = rearrange_allocator.root.label if rearrange_allocator.root else 0
+        rearranged_steps = rearrange_allocator.get_allocation_steps()
+        rearranged_3ac = rearrange_allocator.get_three_address_code()
+    else:
+        # Only - and / present: no rearrangement is possible, reuse the original results
+        rearranged_dag = original_dag
+        rearranged_min_registers = original_min_registers
+        rearranged_steps = original_steps
+        rearranged_3ac = original_3ac
+    
+    return {
+        'success': True,
+        'dag': original_dag,
+        'steps': original_steps,
+        'min_registers': original_min_registers,
+        'three_address_code': original_3ac,
+        'rearranged_dag': rearranged_dag,
+        'rearranged_steps': rearranged_steps,
+        'rearranged_min_registers': rearranged_min_registers,
+        'rearranged_three_address_code': rearranged_3ac
+    }
+
+def analysis_json(expression):
+    """Return the analysis of a normalized expression, encoded as JSON."""
+    return json.dumps(analyze_expression(expression), separators=(',', ':'))
+
+# Resubmitting a short expression skips both the analysis and the encoding.
+# Invalid expressions raise, and exceptions are never cached.
+cached_analysis_json = lru_cache(maxsize=1024)(analysis_json)
 
 # Routes
 @app.route('/')
@@ -381,339 +507,25 @@ def index():
 @app.route('/process', methods=['POST'])
 def process():
     data = request.get_json()
-    expression = data.get('expression', '')
     
-    allocator = RegisterAllocator()
     try:
-        # Parse and analyze original expression
-        allocator.parse_expression(expression)
-        allocator.assign_labels()
-        
-        original_dag = allocator.get_dag_as_dict()
-        original_min_registers = allocator.root.label if allocator.root else 0
-        original_steps = allocator.get_allocation_steps()
-        original_3ac = allocator.get_three_address_code()
-        
-        # Always do rearrangement
-        rearrange_allocator = RegisterAllocator()
-        rearrange_allocator.parse_expression(expression)
-        rearrange_allocator.assign_labels()
-        
-        # Rearrange the DAG
-        rearrange_allocator.rearrange_dag()
-        
-        rearranged_dag = rearrange_allocator.get_dag_as_dict()
-        rearranged_min_registers = rearrange_allocator.root.label if rearrange_allocator.root else 0
-        rearranged_steps = rearrange_allocator.get_allocation_steps()
-        rearranged_3ac = rearrange_allocator.get_three_address_code()
-        
-        return jsonify({
-            'success': True,
-            'dag': original_dag,
-            'steps': original_steps,
-            'min_registers': original_min_registers,
-            'three_address_code': original_3ac,
-            'rearranged_dag': rearranged_dag,
-            'rearranged_steps': rearranged_steps,
-            'rearranged_min_registers': rearranged_min_registers,
-            'rearranged_three_address_code': rearranged_3ac
-        })
+        # Normalize first so trivially different submissions share a cache entry;
+        # inside the try so a non-string expression gets the usual error response
+        expression = normalize_expression(data.get('expression', ''))
+        if len(expression) > MAX_EXPRESSION_LENGTH:
+            raise ValueError(
+                f"Expression is too long ({len(expression)} characters, the limit is {MAX_EXPRESSION_LENGTH})"
+            )
+        if len(expression) <= MAX_CACHED_EXPRESSION_LENGTH:
+            payload = cached_analysis_json(expression)
+        else:
+            payload = analysis_json(expression)
+        return app.response_class(payload, mimetype='application/json')
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
         })
 
-# Create the templates directory if it doesn't exist
-if not os.path.exists('templates'):
-    os.makedirs('templates')
-
-# Create the static directory if it doesn't exist
-if not os.path.exists('static'):
-    os.makedirs('static')
-
-# Create the index.html template
-with open('templates/index.html', 'w') as f:
-    f.write('''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Register Allocation with DAG</title>
-    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.2.3/dist/css/bootstrap.min.css">
-    <script src="https://cdn.jsdelivr.net/npm/vis-network@9.1.2/dist/vis-network.min.js"></script>
-    <style>
-        #dag-container, #rearranged-dag-container {
-            width: 100%;
-            height: 500px;
-            border: 1px solid #ccc;
-            margin-top: 20px;
-        }
-        .variable-node {
-            background-color: #a8d5ba;
-        }
-        .operation-node {
-            background-color: #f9d5e5;
-        }
-        .step {
-            padding: 5px;
-            margin: 5px 0;
-            background-color: #f8f9fa;
-            border-radius: 5px;
-        }
-        .three-address-code {
-            font-family: monospace;
-            padding: 5px;
-            margin: 5px 0;
-            background-color: #f8f9fa;
-            border-radius: 5px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container mt-4">
-        <h1 class="text-center mb-4">Register Allocation using DAG</h1>
-        
-        <div class="row">
-            <div class="col-md-8 offset-md-2">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Input Expression</h5>
-                    </div>
-                    <div class="card-body">
-                        <form id="expression-form">
-                            <div class="mb-3">
-                                <label for="expression" class="form-label">Enter an arithmetic expression:</label>
-                                <input type="text" class="form-control" id="expression" placeholder="e.g., ((a*(b*c))*((d+(e+f))+((g+(h+i))+(j*(k*l)))))">
-                            </div>
-                            <button type="submit" class="btn btn-primary">Analyze</button>
-                        </form>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="row mt-4">
-            <div class="col-md-8">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Original DAG Visualization</h5>
-                    </div>
-                    <div class="card-body">
-                        <div id="dag-container"></div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="col-md-4">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Original Register Allocation</h5>
-                    </div>
-                    <div class="card-body">
-                        <div id="min-registers"></div>
-                        <hr>
-                        <h6>Three-Address Code:</h6>
-                        <div id="three-address-code"></div>
-                        <hr>
-                        <h6>Allocation Steps:</h6>
-                        <div id="allocation-steps"></div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div id="rearranged-section">
-            <div class="row mt-4">
-                <div class="col-md-8">
-                    <div class="card">
-                        <div class="card-header">
-                            <h5>Rearranged DAG Visualization</h5>
-                        </div>
-                        <div class="card-body">
-                            <div id="rearranged-dag-container"></div>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="col-md-4">
-                    <div class="card">
-                        <div class="card-header">
-                            <h5>Rearranged Register Allocation</h5>
-                        </div>
-                        <div class="card-body">
-                            <div id="rearranged-min-registers"></div>
-                            <hr>
-                            <h6>Three-Address Code:</h6>
-                            <div id="rearranged-three-address-code"></div>
-                            <hr>
-                            <h6>Allocation Steps:</h6>
-                            <div id="rearranged-allocation-steps"></div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-        
-        <div class="row mt-4">
-            <div class="col-md-8 offset-md-2">
-                <div class="card">
-                    <div class="card-header">
-                        <h5>Algorithm Explanation</h5>
-                    </div>
-                    <div class="card-body">
-                        <h6>Sethi-Ullman Register Allocation Algorithm:</h6>
-                        <ol>
-                            <li>Represent the expression as a DAG where nodes are operations and leaves are variables/constants.</li>
-                            <li>Assign a "label" to each node that represents the minimum number of registers needed for that subtree.</li>
-                            <li>For leaf nodes (variables):
-                                <ul>
-                                    <li>If it is the leftmost child of its parent, the label is 1</li>
-                                    <li>Otherwise, the label is 0</li>
-                                </ul>
-                            </li>
-                            <li>For internal nodes with two children of labels L₁ and L₂:
-                                <ul>
-                                    <li>If L₁ ≠ L₂, the label is max(L₁, L₂)</li>
-                                    <li>If L₁ = L₂, the label is L₁ + 1</li>
-                                </ul>
-                            </li>
-                            <li>The label of the root node indicates the minimum number of registers needed for the entire expression.</li>
-                        </ol>
-                        
-                        <h6>DAG Rearrangement:</h6>
-                        <p>The DAG can be rearranged using algebraic properties such as commutativity (a+b = b+a) and associativity ((a+b)+c = a+(b+c)) to minimize register requirements.</p>
-                        
-                        <h6>Three-Address Code:</h6>
-                        <p>The three-address code represents the expression using a sequence of simpler statements, each with at most one operator on the right-hand side.</p>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        document.getElementById('expression-form').addEventListener('submit', function(e) {
-            e.preventDefault();
-            const expression = document.getElementById('expression').value.trim();
-            
-            if (expression) {
-                fetch('/process', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({ 
-                        expression: expression
-                    })
-                })
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        // Display original DAG and allocation info
-                        visualizeDAG(data.dag, 'dag-container');
-                        displayAllocationInfo(
-                            data.min_registers, 
-                            data.steps, 
-                            data.three_address_code,
-                            'min-registers', 
-                            'allocation-steps',
-                            'three-address-code'
-                        );
-                        
-                        // Always show rearranged section
-                        visualizeDAG(data.rearranged_dag, 'rearranged-dag-container');
-                        displayAllocationInfo(
-                            data.rearranged_min_registers, 
-                            data.rearranged_steps,
-                            data.rearranged_three_address_code,
-                            'rearranged-min-registers', 
-                            'rearranged-allocation-steps',
-                            'rearranged-three-address-code'
-                        );
-                    } else {
-                        alert('Error: ' + data.error);
-                    }
-                })
-                .catch(error => {
-                    console.error('Error:', error);
-                    alert('An error occurred while processing the expression.');
-                });
-            }
-        });
-        
-        function visualizeDAG(dagData, containerId) {
-            const container = document.getElementById(containerId);
-            
-            // Node display options
-            const nodes = new vis.DataSet(dagData.nodes.map(node => ({
-                id: node.id,
-                label: node.label,
-                color: {
-                    background: node.group === 'variable' ? '#a8d5ba' : '#f9d5e5',
-                    border: '#2c3e50'
-                },
-                font: { size: 14 }
-            })));
-            
-            // Edge display options
-            const edges = new vis.DataSet(dagData.edges.map(edge => ({
-                from: edge.from,
-                to: edge.to,
-                arrows: 'to',
-                width: 2,
-                color: { color: '#2c3e50' }
-            })));
-            
-            // Network options
-            const options = {
-                layout: {
-                    hierarchical: {
-                        direction: 'UD',
-                        sortMethod: 'directed',
-                        levelSeparation: 100
-                    }
-                },
-                physics: false,
-                interaction: {
-                    dragNodes: true,
-                    dragView: true,
-                    zoomView: true
-                }
-            };
-            
-            // Create the network
-            new vis.Network(container, { nodes, edges }, options);
-        }
-        
-        function displayAllocationInfo(minRegisters, steps, threeAddressCode, minRegistersId, stepsId, threeAddressCodeId) {
-            // Display minimum registers
-            const minRegistersDiv = document.getElementById(minRegistersId);
-            minRegistersDiv.innerHTML = `<p><strong>Minimum registers required:</strong> ${minRegisters}</p>`;
-            
-            // Display three-address code
-            const threeAddressCodeDiv = document.getElementById(threeAddressCodeId);
-            threeAddressCodeDiv.innerHTML = '';
-            threeAddressCode.forEach((code, index) => {
-                const codeElement = document.createElement('div');
-                codeElement.className = 'three-address-code';
-                codeElement.textContent = code;
-                threeAddressCodeDiv.appendChild(codeElement);
-            });
-            
-            // Display allocation steps
-            const stepsDiv = document.getElementById(stepsId);
-            stepsDiv.innerHTML = '';
-            steps.forEach((step, index) => {
-                const stepElement = document.createElement('div');
-                stepElement.className = 'step';
-                stepElement.innerHTML = `<strong>Step ${index + 1}:</strong> ${step}`;
-                stepsDiv.appendChild(stepElement);
-            });
-        }
-    </script>
-</body>
-</html>''')
-
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
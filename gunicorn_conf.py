@@ -0,0 +1,9 @@
+# Gunicorn settings for serving the app: gunicorn -c gunicorn_conf.py app:app
+
+# Import app.py once in the master process and fork the workers from it,
+# instead of paying the import cost again in every worker
+preload_app = True
+
+workers = 4
+worker_class = 'gthread'
+threads = 2